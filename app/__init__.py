@@ -1,3 +1,4 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
@@ -6,20 +7,75 @@ from flask_cors import CORS
 
 db = SQLAlchemy()
 
-def create_app():
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Set once the database revision has been verified in this process, so a
+# preloaded app (or repeated create_app calls) only pays for the check once
+_migrations_checked = False
+
+def check_migrations(app):
+    """Fail fast if the database is not at the latest Alembic revision."""
+    global _migrations_checked
+    if _migrations_checked:
+        return
+
+    # Imported here so Alembic is only loaded when the check actually runs
+    from alembic.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    heads = set(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+    with app.app_context():
+        with db.engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+        # Don't hand the check's connection down to forked workers
+        db.engine.dispose()
+
+    if current != heads:
+        raise RuntimeError(
+            f"Database revision {sorted(current)} does not match migration head "
+            f"{sorted(heads)}; run `flask db upgrade` before starting the app"
+        )
+    _migrations_checked = True
+
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     CORS(app, resources = {r"/*": {"origins": "http://10.0.0.171:8080"}})
 
 
-    
+
     db.init_app(app)
-    
+
     JWTManager(app)  # Initialize JWT Manager without assigning to a variable
-    
-    with app.app_context():
-        from .routes import api  # Import routes
-        app.register_blueprint(api)
-        db.create_all()  # Create tables if they don't exist
-        
+
+    from .compression import Compression
+    Compression(app)
+
+    # The flask CLI (`flask db ...`) must start even when the schema is behind,
+    # since that is how it gets fixed, so it neither checks nor creates tables
+    running_cli = os.environ.get('FLASK_RUN_FROM_CLI') == 'true'
+
+    # Registers the `flask db` commands used by migrations/env.py. Flask-Migrate
+    # pulls in Alembic, so only load it when started through the flask CLI
+    if running_cli:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=MIGRATIONS_DIR)
+
+    from .routes import api  # Import routes
+    app.register_blueprint(api)
+
+    if running_cli:
+        return app
+
+    if app.config['STARTUP_MODE'] == 'production':
+        # Schema is managed by Alembic; skip create_all's inspection queries
+        if app.config['CHECK_MIGRATIONS']:
+            check_migrations(app)
+    else:
+        with app.app_context():
+            # Only bootstrap a fresh database. Once it is stamped, Alembic owns
+            # the schema and new tables must come from `flask db upgrade`
+            if not db.inspect(db.engine).has_table('alembic_version'):
+                db.create_all()  # Create tables if they don't exist
+
     return app
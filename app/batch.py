@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g
+from flask_jwt_extended import get_current_user, get_jwt, get_jwt_header, get_jwt_request_location
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import HTTPException
+
+from app import db
+
+
+def batchable(f):
+    """Allow a view in POST /batch. Apply directly below @jwt_required().
+
+    The batch verifies the JWT once and then calls the function given here,
+    skipping the @jwt_required() wrapper above it.
+    """
+    f.batch_view = f  # Copied onto the @jwt_required() wrapper by functools.wraps
+    return f
+
+
+def capture_jwt():
+    """Return the verified JWT of the current request, read through the public API."""
+    try:
+        user = get_current_user()
+    except RuntimeError:
+        user = None  # No @jwt.user_lookup_loader is registered
+    return {
+        "jwt": get_jwt(),
+        "header": get_jwt_header(),
+        "user": user,
+        "location": get_jwt_request_location(),
+    }
+
+
+def restore_jwt(jwt_context):
+    """Make a captured JWT current, as if @jwt_required() had just verified it.
+
+    flask-jwt-extended has no public setter, so this writes the attributes
+    that verify_jwt_in_request() sets. They are private to the version
+    pinned in requirements.txt; tests/test_batch.py fails if they change.
+    """
+    g._jwt_extended_jwt = jwt_context["jwt"]
+    g._jwt_extended_jwt_header = jwt_context["header"]
+    g._jwt_extended_jwt_user = {"loaded_user": jwt_context["user"]}
+    g._jwt_extended_jwt_location = jwt_context["location"]
+
+
+def _dispatch(app, item, jwt_context):
+    """Run one sub-request in a request context and return its result dict."""
+    restore_jwt(jwt_context)
+
+    try:
+        # Headers is case-insensitive, so no spelling of Authorization gets through
+        headers = Headers(item.get("headers") or {})
+        headers.remove("Authorization")
+        headers["Accept"] = "application/json"  # Results are embedded in one JSON body
+        ctx = app.test_request_context(
+            item["path"], method=item["method"], json=item.get("body"), headers=headers
+        )
+    except (TypeError, ValueError) as e:
+        return {"status": 400, "body": {"message": f"Invalid request: {e}"}}
+
+    with ctx:
+        try:
+            endpoint, view_args = ctx.url_adapter.match()
+            batch_view = getattr(app.view_functions[endpoint], "batch_view", None)
+            if batch_view is None:
+                return {"status": 400, "body": {"message": f"{item['path']} cannot be batched"}}
+            # The JWT was verified once for the whole batch
+            response = app.make_response(batch_view(**view_args))
+        except HTTPException as e:
+            db.session.rollback()
+            return {"status": e.code, "body": {"message": e.description}}
+        except Exception:
+            db.session.rollback()
+            # Don't leak SQL or driver errors to the client
+            app.logger.exception("Batch sub-request %s %s failed", item["method"], item["path"])
+            return {"status": 500, "body": {"message": "Internal server error"}}
+
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True) or None
+        return {"status": response.status_code, "body": body}
+
+
+def _dispatch_read(app, item, jwt_context):
+    # Each concurrent read gets its own app context and so its own session
+    with app.app_context():
+        return _dispatch(app, item, jwt_context)
+
+
+def run_batch(items):
+    """Run sub-requests against the api blueprint and return their results in order.
+
+    Runs of consecutive GET requests execute concurrently, while other methods
+    run one at a time in the caller's app context and session, so a write is
+    always seen by the requests after it.
+    """
+    app = current_app._get_current_object()
+    jwt_context = capture_jwt()
+    results = [None] * len(items)
+
+    reads = []
+    with ThreadPoolExecutor(max_workers=app.config["BATCH_MAX_WORKERS"]) as executor:
+        for index, item in enumerate(items + [None]):
+            if item is not None and item["method"] == "GET":
+                reads.append(index)
+                continue
+            # Finish any pending reads before the next write, or at the end
+            futures = {i: executor.submit(_dispatch_read, app, items[i], jwt_context) for i in reads}
+            for i, future in futures.items():
+                results[i] = future.result()
+            reads = []
+            if item is not None:
+                results[index] = _dispatch(app, item, jwt_context)
+
+    return results
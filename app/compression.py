@@ -0,0 +1,153 @@
+import logging
+import zlib
+
+from flask import request
+
+# brotli and zstandard are optional; without them only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/msgpack",
+    "text/html",
+    "text/plain",
+}
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class Compression:
+    """Compress responses with the best encoding the client accepts.
+
+    Bodies smaller than COMPRESS_MIN_SIZE are sent as is, streamed responses
+    are compressed chunk by chunk, and levels are kept low to bound CPU per
+    request. The ratio of each response is reported in the X-Compression-Ratio
+    header (and logged for streams) so it can be aggregated across workers
+    from the access log.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = app.config["COMPRESS_MIN_SIZE"]
+        # Preferred first when the client weighs encodings equally
+        self.encoders = {}
+        if zstandard is not None:
+            self.encoders["zstd"] = (_ZstdEncoder, app.config["COMPRESS_ZSTD_LEVEL"])
+        if brotli is not None:
+            self.encoders["br"] = (_BrotliEncoder, app.config["COMPRESS_BROTLI_LEVEL"])
+        self.encoders["gzip"] = (_GzipEncoder, app.config["COMPRESS_GZIP_LEVEL"])
+
+        app.extensions["compression"] = self
+        app.after_request(self.compress_response)
+
+    def _log_stream_ratio(self, encoding, bytes_in, bytes_out):
+        logger.info(
+            "compressed encoding=%s bytes_in=%d bytes_out=%d ratio=%.2f",
+            encoding, bytes_in, bytes_out, bytes_in / bytes_out if bytes_out else 0,
+        )
+
+    def compress_response(self, response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(list(self.encoders))
+        if encoding is None:
+            return response
+
+        encoder_class, level = self.encoders[encoding]
+        if response.is_streamed:
+            response.response = self._compress_stream(
+                response.response, encoder_class(level), encoding
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            encoder = encoder_class(level)
+            compressed = encoder.compress(data) + encoder.finish()
+            response.set_data(compressed)
+            response.headers["X-Compression-Ratio"] = f"{len(data) / len(compressed):.2f}"
+
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def _compress_stream(self, chunks, encoder, encoding):
+        bytes_in = bytes_out = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                bytes_in += len(chunk)
+                # Flush every chunk so clients keep receiving data as it is produced
+                out = encoder.compress(chunk) + encoder.flush()
+                bytes_out += len(out)
+                if out:
+                    yield out
+            out = encoder.finish()
+            bytes_out += len(out)
+            yield out
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+            self._log_stream_ratio(encoding, bytes_in, bytes_out)
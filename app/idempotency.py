@@ -0,0 +1,125 @@
+import hashlib
+import itertools
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import IdempotencyKeys
+
+# Expired keys are purged on every Nth claim rather than on every request
+PURGE_EVERY = 100
+_claims = itertools.count(1)
+
+POLL_INTERVAL = 0.1  # seconds between checks while another request holds the key
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _claim(user, path, key, fingerprint):
+    """Insert the key as in progress. Returns the new row, or None if the key exists."""
+    now = _now()
+    if next(_claims) % PURGE_EVERY == 0:
+        IdempotencyKeys.query.filter(IdempotencyKeys.expires_at < now).delete()
+    row = IdempotencyKeys(
+        user=user,
+        path=path,
+        key=key,
+        fingerprint=fingerprint,
+        created_at=now,
+        expires_at=now + timedelta(seconds=current_app.config["IDEMPOTENCY_TTL"]),
+    )
+    db.session.add(row)
+    try:
+        # The unique index on (user, path, key) lets exactly one request win,
+        # across threads, workers and hosts
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return row
+
+
+def _replay(row):
+    response = current_app.response_class(row.body, row.status_code, json.loads(row.headers))
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(f):
+    """Replay the stored response for POST requests that repeat an Idempotency-Key.
+
+    Keys are claimed in the idempotency_keys table, so duplicates are
+    coalesced across all workers: the first request runs the handler and
+    the others wait for its stored response. Must be applied below
+    @jwt_required() since keys are scoped per user.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if request.method != "POST" or not key:
+            return f(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({"message": "Idempotency-Key must be at most 255 characters"}), 400
+
+        # Scoped by user id, so keys survive a username change and re-login
+        user = str(get_jwt_identity()["id"])
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        wait_timeout = current_app.config["IDEMPOTENCY_WAIT_TIMEOUT"]
+        deadline = time.monotonic() + wait_timeout
+
+        while True:
+            claimed = _claim(user, request.path, key, fingerprint)
+            if claimed is not None:
+                break
+
+            row = IdempotencyKeys.query.filter_by(user=user, path=request.path, key=key).first()
+            if row is None:
+                continue  # The holder failed and released the key
+            if row.fingerprint != fingerprint:
+                return jsonify({"message": "Idempotency-Key was already used with a different request"}), 422
+
+            now = _now()
+            lock_timeout = timedelta(seconds=current_app.config["IDEMPOTENCY_LOCK_TIMEOUT"])
+            abandoned = row.status_code is None and row.created_at < now - lock_timeout
+            if row.expires_at < now or abandoned:
+                # Expired, or the worker holding it died; free the key and claim it again
+                db.session.delete(row)
+                db.session.commit()
+                continue
+            if row.status_code is not None:
+                return _replay(row)
+
+            if time.monotonic() >= deadline:
+                return jsonify({"message": "A request with this Idempotency-Key is still in progress"}), 409
+            # End the transaction so the next read sees the holder's commit
+            db.session.rollback()
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            response = current_app.make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            db.session.delete(claimed)
+            db.session.commit()
+            raise
+
+        # Only successes are replayed; errors may be transient and should be retried
+        if 200 <= response.status_code < 300:
+            claimed.status_code = response.status_code
+            claimed.headers = json.dumps(list(response.headers))
+            claimed.body = response.get_data()
+        else:
+            db.session.rollback()
+            db.session.delete(claimed)
+        db.session.commit()
+        return response
+
+    return decorated
@@ -39,6 +39,14 @@ class Projects(db.Model):
     # Relationship to Users
     user = db.relationship('Users', back_populates='projects')
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class Tasks(db.Model):
     __tablename__ = 'tasks'
     
@@ -108,6 +116,14 @@ class Notifications(db.Model):
     # Relationship to Users
     user = db.relationship('Users', back_populates='notifications')
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'message': self.message,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class CalendarEvents(db.Model):
     __tablename__ = 'calendar_events'
     
@@ -120,4 +136,49 @@ class CalendarEvents(db.Model):
     # Relationship to Users
     user = db.relationship('Users', back_populates='calendar_events')
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'date': self.date.isoformat(),
+            'description': self.description
+        }
+
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.Index('ix_change_log_user_id_seq', 'user_id', 'seq'),
+        db.UniqueConstraint('seq', name='uq_change_log_seq'),
+    )
 
+    id = db.Column(db.Integer, primary_key=True)
+    # Sync cursor, assigned in commit order after the row is committed (see app/sync.py)
+    seq = db.Column(db.Integer)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    resource = db.Column(db.String(20), nullable=False)
+    resource_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.Enum('upsert', 'delete'), nullable=False)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class ChangeLogSequence(db.Model):
+    __tablename__ = 'change_log_sequence'
+
+    # Single row holding the last seq handed out; locked while assigning more
+    id = db.Column(db.Integer, primary_key=True)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+
+class IdempotencyKeys(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (db.UniqueConstraint('user', 'path', 'key', name='uq_idempotency_keys_scope'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user = db.Column(db.String(255), nullable=False)
+    path = db.Column(db.String(255), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    # Null until the first request finishes successfully
+    status_code = db.Column(db.Integer)
+    headers = db.Column(db.Text)
+    body = db.Column(db.LargeBinary(length=2**24))
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -1,10 +1,14 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from app import db
 from app.models import Users, Projects, Tasks, UserProfile, UserSettings, Notifications, CalendarEvents
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from flask_cors import cross_origin
+from app.idempotency import idempotent
+from app.wire import list_response
+from app.sync import record_change, changes_since
+from app.batch import batchable, run_batch
 
 api = Blueprint("api", __name__)
 
@@ -13,13 +17,15 @@ api = Blueprint("api", __name__)
 # GET Task by ID
 @api.route("/tasks", methods=["GET"])
 @jwt_required()
+@batchable
 def get_tasks():
     tasks = Tasks.query.all()
-    return jsonify([task.to_dict() for task in tasks])
+    return list_response([task.to_dict() for task in tasks])
 
 # GET All Tasks
 @api.route("/tasks/<int:id>", methods=["GET"])
 @jwt_required()
+@batchable
 def get_task(id):
     task = Tasks.query.get_or_404(id)
     return jsonify(task.to_dict())
@@ -27,10 +33,14 @@ def get_task(id):
 # POST Create A New Task
 @api.route("/tasks", methods=["POST"])
 @jwt_required()
+@batchable
+@idempotent
 def create_task():
     data = request.get_json()
     if not all(key in data for key in ("title", "project_id")):
         return jsonify({"message": "Missing required fields"}), 400
+    if not db.session.get(Projects, data["project_id"]):
+        return jsonify({"message": "Project not found"}), 400
     try:
         due_date = (
             datetime.strptime(data.get("due_date"), "%Y-%m-%d")
@@ -46,6 +56,7 @@ def create_task():
             project_id=data["project_id"],
         )
         db.session.add(task)
+        record_change("tasks", task)
         db.session.commit()
         return jsonify(task.to_dict()), 201
     except Exception as e:
@@ -54,9 +65,13 @@ def create_task():
 # PUT Update existing tasks
 @api.route("/tasks/<int:id>", methods=["PUT"])
 @jwt_required()
+@batchable
 def update_task(id):
     data = request.get_json()
     task = Tasks.query.get_or_404(id)
+    if "project_id" in data and not db.session.get(Projects, data["project_id"]):
+        return jsonify({"message": "Project not found"}), 400
+    previous_owner = db.session.get(Projects, task.project_id).user_id
     task.title = data.get("title", task.title)
     task.description = data.get("description", task.description)
     task.status = data.get("status", task.status)
@@ -67,14 +82,20 @@ def update_task(id):
     )
     task.priority = data.get("priority", task.priority)
     task.project_id = data.get("project_id", task.project_id)
+    if db.session.get(Projects, task.project_id).user_id != previous_owner:
+        # Moved to another user's project; the previous owner must drop it
+        record_change("tasks", task, "delete", user_id=previous_owner)
+    record_change("tasks", task)
     db.session.commit()
     return jsonify(task.to_dict())
 
 # DELETE Task by ID
 @api.route("/tasks/<int:id>", methods=["DELETE"])
 @jwt_required()
+@batchable
 def delete_task(id):
     task = Tasks.query.get_or_404(id)
+    record_change("tasks", task, "delete")
     db.session.delete(task)
     db.session.commit()
     return "", 204
@@ -84,9 +105,10 @@ def delete_task(id):
 # GET All Projects
 @api.route("/projects", methods=["GET"])
 @jwt_required()
+@batchable
 def get_projects():
     projects = Projects.query.all()
-    return jsonify(
+    return list_response(
         [
             {
                 "id": project.id,
@@ -103,6 +125,7 @@ def get_projects():
 # GET Project by Project ID
 @api.route("/projects/<int:project_id>", methods=["GET"])
 @jwt_required()
+@batchable
 def get_project(project_id):
     project = Projects.query.get_or_404(project_id)
     return jsonify(
@@ -119,6 +142,8 @@ def get_project(project_id):
 # POST Create A New Project
 @api.route("/projects", methods=["POST"])
 @jwt_required()
+@batchable
+@idempotent
 def create_project():
     data = request.get_json()
     user_id = get_jwt_identity()["id"]  # Get the user ID from the JWT token
@@ -129,6 +154,7 @@ def create_project():
             description=data.get("description"),
         )
         db.session.add(project)
+        record_change("projects", project)
         db.session.commit()
         return jsonify({
             "id": project.id,
@@ -142,11 +168,13 @@ def create_project():
 # PUT Update existing project details
 @api.route("/projects/<int:project_id>", methods=["PUT"])
 @jwt_required()
+@batchable
 def update_project(project_id):
     data = request.get_json()
     project = Projects.query.get_or_404(project_id)
     project.name = data.get("name", project.name)
     project.description = data.get("description", project.description)
+    record_change("projects", project)
     db.session.commit()
     return jsonify(
         {
@@ -162,8 +190,10 @@ def update_project(project_id):
 # DELETE Project by Project ID
 @api.route("/projects/<int:project_id>", methods=["DELETE"])
 @jwt_required()
+@batchable
 def delete_project(project_id):
     project = Projects.query.get_or_404(project_id)
+    record_change("projects", project, "delete")
     db.session.delete(project)
     db.session.commit()
     return "Project Successfully deleted.", 204
@@ -226,6 +256,7 @@ def login():
 
 @api.route('/user_profile', methods=['GET'])
 @jwt_required()
+@batchable
 @cross_origin()
 def get_user_profile():
     user_id = get_jwt_identity()
@@ -258,6 +289,7 @@ def get_user_profile():
 
 @api.route("/user_profile", methods=["POST"])
 @jwt_required()
+@batchable
 def update_user_profile():
     user_id = get_jwt_identity()['id']
     data = request.get_json()
@@ -293,6 +325,7 @@ def update_user_profile():
 
 @api.route('/user_settings', methods=['GET', 'POST'])
 @jwt_required()
+@batchable
 def manage_user_settings():
     user_id = get_jwt_identity()
 
@@ -329,12 +362,14 @@ def manage_user_settings():
 
 @api.route('/notifications', methods=['GET', 'POST'])
 @jwt_required()
+@batchable
+@idempotent
 def manage_notifications():
     user_id = get_jwt_identity()
 
     if request.method == 'GET':
         notifications = Notifications.query.filter_by(user_id=user_id).all()
-        return jsonify([{
+        return list_response([{
             'message': notification.message,
             'status': notification.status,
             'created_at': notification.created_at.isoformat()
@@ -348,12 +383,14 @@ def manage_notifications():
             status='unread'
         )
         db.session.add(notification)
+        record_change('notifications', notification)
         db.session.commit()
         return jsonify({'message': 'Notification created successfully'})
 
 
 @api.route('/notifications/<int:notification_id>', methods=['PUT', 'DELETE'])
 @jwt_required()
+@batchable
 def update_delete_notification(notification_id):
     user_id = get_jwt_identity()
     notification = Notifications.query.filter_by(id=notification_id, user_id=user_id).first()
@@ -364,10 +401,12 @@ def update_delete_notification(notification_id):
     if request.method == 'PUT':
         data = request.json
         notification.status = data.get('status', notification.status)
+        record_change('notifications', notification)
         db.session.commit()
         return jsonify({'message': 'Notification updated successfully'})
 
     if request.method == 'DELETE':
+        record_change('notifications', notification, 'delete')
         db.session.delete(notification)
         db.session.commit()
         return jsonify({'message': 'Notification deleted successfully'})
@@ -375,12 +414,14 @@ def update_delete_notification(notification_id):
 
 @api.route('/calendar_events', methods=['GET', 'POST'])
 @jwt_required()
+@batchable
+@idempotent
 def manage_calendar_events():
     user_id = get_jwt_identity()
 
     if request.method == 'GET':
         events = CalendarEvents.query.filter_by(user_id=user_id).all()
-        return jsonify([{
+        return list_response([{
             'title': event.title,
             'date': event.date.isoformat(),
             'description': event.description
@@ -395,12 +436,14 @@ def manage_calendar_events():
             description=data.get('description')
         )
         db.session.add(event)
+        record_change('calendar_events', event)
         db.session.commit()
         return jsonify({'message': 'Event created successfully'})
 
 
 @api.route('/calendar_events/<int:event_id>', methods=['PUT', 'DELETE'])
 @jwt_required()
+@batchable
 def update_delete_calendar_event(event_id):
     user_id = get_jwt_identity()
     event = CalendarEvents.query.filter_by(id=event_id, user_id=user_id).first()
@@ -413,10 +456,52 @@ def update_delete_calendar_event(event_id):
         event.title = data.get('title', event.title)
         event.date = data.get('date', event.date)
         event.description = data.get('description', event.description)
+        record_change('calendar_events', event)
         db.session.commit()
         return jsonify({'message': 'Event updated successfully'})
 
     if request.method == 'DELETE':
+        record_change('calendar_events', event, 'delete')
         db.session.delete(event)
         db.session.commit()
-        return jsonify({'message': 'Event deleted successfully'})
\ No newline at end of file
+        return jsonify({'message': 'Event deleted successfully'})
+
+
+# GET Changes to the user's tasks, projects, notifications and events since a cursor
+@api.route('/sync', methods=['GET'])
+@jwt_required()
+@batchable
+def sync():
+    user_id = get_jwt_identity()["id"]
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', 500)), 1000)
+    except ValueError:
+        return jsonify({'message': 'since and limit must be integers'}), 400
+    if since < 0 or limit < 1:
+        return jsonify({'message': 'since must be >= 0 and limit >= 1'}), 400
+    return jsonify(changes_since(user_id, since, limit))
+
+
+# POST Run several API requests in one round trip
+@api.route('/batch', methods=['POST'])
+@jwt_required()
+def batch():
+    data = request.get_json()
+    items = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'requests must be a non-empty list'}), 400
+    if len(items) > current_app.config['BATCH_MAX_REQUESTS']:
+        return jsonify({'message': f"At most {current_app.config['BATCH_MAX_REQUESTS']} requests per batch"}), 400
+
+    sub_requests = []
+    for item in items:
+        if not isinstance(item, dict) or not str(item.get('path', '')).startswith('/'):
+            return jsonify({'message': 'Each request needs a path starting with /'}), 400
+        headers = item.get('headers', {})
+        if not isinstance(headers, dict) or not all(isinstance(v, str) for v in headers.values()):
+            return jsonify({'message': 'headers must be an object of string values'}), 400
+        sub_requests.append(dict(item, method=str(item.get('method', 'GET')).upper()))
+
+    return jsonify({'responses': run_batch(sub_requests)})
+
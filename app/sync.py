@@ -0,0 +1,127 @@
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import ChangeLog, ChangeLogSequence, Projects, Tasks, Notifications, CalendarEvents
+
+SYNC_RESOURCES = {
+    'tasks': Tasks,
+    'projects': Projects,
+    'notifications': Notifications,
+    'calendar_events': CalendarEvents,
+}
+
+
+def record_change(resource, obj, action='upsert', user_id=None):
+    """Append a change for obj to the change log in the current session.
+
+    Call before db.session.commit() so the change is committed with the
+    write it describes. New objects are flushed first to get their id.
+    The change goes to obj's owner unless user_id is given; for tasks the
+    caller must have checked that the project exists.
+    """
+    if obj.id is None:
+        db.session.flush()
+    if user_id is None and resource == 'tasks':
+        # Tasks belong to a user through their project
+        user_id = db.session.get(Projects, obj.project_id).user_id
+    elif user_id is None:
+        user_id = obj.user_id
+    db.session.add(ChangeLog(
+        user_id=user_id,
+        resource=resource,
+        resource_id=obj.id,
+        action=action,
+    ))
+
+
+def assign_sequence():
+    """Give every committed change without a seq the next seq numbers, in id order.
+
+    Ids are allocated at flush, so a transaction can commit after a later id
+    was already synced. Seqs are handed out only to committed rows while the
+    counter row is locked, so a late commit always lands after every cursor
+    a client may already hold.
+    """
+    pending = select(ChangeLog.id).where(ChangeLog.seq.is_(None))
+    # Checked outside db.session so the session's first read comes after sequencing
+    with db.engine.connect() as connection:
+        if connection.execute(pending.limit(1)).first() is None:
+            return
+
+    # Own transaction, so the read below starts after the lock is taken
+    with db.engine.begin() as connection:
+        counter = ChangeLogSequence.__table__
+        locked = connection.execute(
+            update(counter).where(counter.c.id == 1).values(last_seq=counter.c.last_seq)
+        ).rowcount
+        if not locked:
+            last_seq = connection.execute(select(func.coalesce(func.max(ChangeLog.seq), 0))).scalar()
+            try:
+                with connection.begin_nested():
+                    connection.execute(counter.insert().values(id=1, last_seq=last_seq))
+            except IntegrityError:
+                # Another request created it first; wait for its lock instead
+                connection.execute(
+                    update(counter).where(counter.c.id == 1).values(last_seq=counter.c.last_seq)
+                )
+        last_seq = connection.execute(select(counter.c.last_seq).where(counter.c.id == 1)).scalar()
+
+        ids = connection.execute(pending.order_by(ChangeLog.id)).scalars().all()
+        if ids:
+            change_log = ChangeLog.__table__
+            connection.execute(
+                update(change_log).where(change_log.c.id == bindparam('change_id')).values(seq=bindparam('new_seq')),
+                [{'change_id': change_id, 'new_seq': seq} for seq, change_id in enumerate(ids, start=last_seq + 1)],
+            )
+        connection.execute(
+            update(counter).where(counter.c.id == 1).values(last_seq=last_seq + len(ids))
+        )
+
+
+def changes_since(user_id, since, limit):
+    """Return one page of the user's changes after the cursor `since`.
+
+    Several changes to the same object within a page are collapsed into
+    the latest one, and upserts carry the object's current state.
+    """
+    assign_sequence()
+    rows = (
+        ChangeLog.query
+        .filter(ChangeLog.user_id == user_id, ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = {}
+    for row in rows:
+        key = (row.resource, row.resource_id)
+        latest.pop(key, None)  # Re-insert so the dict stays in change order
+        latest[key] = row.action
+
+    # Load current state with one query per resource type
+    objects = {}
+    for resource, model in SYNC_RESOURCES.items():
+        ids = [resource_id for (name, resource_id), action in latest.items()
+               if name == resource and action == 'upsert']
+        if ids:
+            for obj in model.query.filter(model.id.in_(ids)).all():
+                objects[(resource, obj.id)] = obj
+
+    changes = []
+    for (resource, resource_id), action in latest.items():
+        obj = objects.get((resource, resource_id))
+        if obj is None:
+            # Deleted since the upsert was logged; the delete is at a later cursor
+            changes.append({'resource': resource, 'id': resource_id, 'action': 'delete', 'data': None})
+        else:
+            changes.append({'resource': resource, 'id': resource_id, 'action': 'upsert', 'data': obj.to_dict()})
+
+    return {
+        'changes': changes,
+        'cursor': rows[-1].seq if rows else since,
+        'has_more': has_more,
+    }
@@ -0,0 +1,24 @@
+from flask import current_app, jsonify, request
+
+# msgpack is optional; without it list endpoints always answer with JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def list_response(items):
+    """Return items as MessagePack if the client prefers it, otherwise as JSON."""
+    if msgpack is not None:
+        best = request.accept_mimetypes.best_match(["application/json", MSGPACK_MIMETYPE])
+        if best == MSGPACK_MIMETYPE:
+            response = current_app.response_class(
+                msgpack.packb(items, use_bin_type=True), mimetype=MSGPACK_MIMETYPE
+            )
+        else:
+            response = jsonify(items)
+        response.vary.add("Accept")
+        return response
+    return jsonify(items)
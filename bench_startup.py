@@ -0,0 +1,74 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Runs in a fresh interpreter so every phase is measured from a cold start
+PHASES = r'''
+import json, time
+timings = {}
+start = last = time.perf_counter()
+
+def mark(name):
+    global last
+    now = time.perf_counter()
+    timings[name] = now - last
+    last = now
+
+import flask
+mark("import flask")
+import flask_sqlalchemy
+mark("import flask_sqlalchemy")
+import flask_jwt_extended, flask_cors
+mark("import flask_jwt_extended/flask_cors")
+import app
+mark("import app")
+import app.models
+mark("import app.models")
+import app.routes
+mark("import app.routes")
+application = app.create_app()
+mark("create_app")
+# Failed login still looks up the user, so this opens the first DB connection
+application.test_client().post("/login", json={"email": "bench@example.com", "password": "bench"})
+mark("first request (POST /login)")
+timings["total"] = time.perf_counter() - start
+print(json.dumps(timings))
+'''
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, "-c", PHASES],
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"STARTUP_MODE={env['STARTUP_MODE']} failed to boot:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {}
+
+    for mode in ("development", "production"):
+        env = dict(os.environ, STARTUP_MODE=mode)
+        samples = [run_once(env) for _ in range(runs)]
+        results[mode] = {
+            phase: statistics.median(sample[phase] for sample in samples)
+            for phase in samples[0]
+        }
+
+    print(f"Startup time, median of {runs} cold runs (ms)")
+    print(f"{'phase':<40}{'development':>14}{'production':>14}")
+    for phase in results["development"]:
+        print(
+            f"{phase:<40}"
+            f"{results['development'][phase] * 1000:>14.1f}"
+            f"{results['production'][phase] * 1000:>14.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import multiprocessing
+import os
+
+# Gunicorn is the production entry point; skip create_all unless overridden
+os.environ.setdefault('STARTUP_MODE', 'production')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Build the app once in the master and fork workers from it, so imports and
+# the migration check in create_app are not repeated per worker
+preload_app = True
+
+# Per-response compression ratio, aggregated from the access log across workers
+accesslog = '-'
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(D)sus ratio=%({x-compression-ratio}o)s'
+
+def post_fork(server, worker):
+    # Workers must not reuse connections opened by the master before forking.
+    # server.app.wsgi() is the app preloaded from whatever entry point was given
+    from app import db
+    flask_app = server.app.wsgi()
+    with flask_app.app_context():
+        db.engine.dispose(close=False)
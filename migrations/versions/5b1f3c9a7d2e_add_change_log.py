@@ -0,0 +1,38 @@
+"""Add change_log
+
+Revision ID: 5b1f3c9a7d2e
+Revises: 2843e868ea6a
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1f3c9a7d2e'
+down_revision = '2843e868ea6a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('resource', sa.String(length=20), nullable=False),
+    sa.Column('resource_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.Enum('upsert', 'delete'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.create_index('ix_change_log_user_id_id', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_change_log_user_id_id')
+
+    op.drop_table('change_log')
@@ -0,0 +1,45 @@
+"""Sequence change_log after commit
+
+Revision ID: d81a6f5c3e47
+Revises: 9c4e2a7b1f30
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81a6f5c3e47'
+down_revision = '9c4e2a7b1f30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seq', sa.Integer(), nullable=True))
+        batch_op.create_unique_constraint('uq_change_log_seq', ['seq'])
+        batch_op.create_index('ix_change_log_user_id_seq', ['user_id', 'seq'], unique=False)
+        # Sync now pages by seq; (user_id, seq) also covers the user_id foreign key
+        batch_op.drop_index('ix_change_log_user_id_id')
+
+    op.create_table('change_log_sequence',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Existing cursors were change_log ids, so keep them valid
+    op.execute('UPDATE change_log SET seq = id')
+    op.execute('INSERT INTO change_log_sequence (id, last_seq) SELECT 1, COALESCE(MAX(id), 0) FROM change_log')
+
+
+def downgrade():
+    op.drop_table('change_log_sequence')
+
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.create_index('ix_change_log_user_id_id', ['user_id', 'id'], unique=False)
+        batch_op.drop_index('ix_change_log_user_id_seq')
+        batch_op.drop_constraint('uq_change_log_seq', type_='unique')
+        batch_op.drop_column('seq')
@@ -1,6 +1,7 @@
 from app import create_app
 
 # Create the Flask application
+# (`gunicorn run:app` uses gunicorn.conf.py to preload it in production mode)
 app = create_app()
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.config import Config
+from app.models import Users, Projects
+
+
+def make_app(database_uri, **config):
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        SECRET_KEY = JWT_SECRET_KEY = 'test-secret-key-that-is-long-enough-for-hs256'
+        # /login issues a dict identity, which newer flask-jwt-extended rejects by default
+        JWT_VERIFY_SUB = False
+        TESTING = True
+        STARTUP_MODE = 'development'
+
+    for name, value in config.items():
+        setattr(TestConfig, name, value)
+    return create_app(TestConfig)
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture
+def app(database_uri):
+    app = make_app(database_uri)
+    with app.app_context():
+        user = Users(username='alice', email='alice@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        db.session.add(Projects(user_id=user.id, name='Inbox'))
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(app):
+    with app.app_context():
+        token = create_access_token(identity={'id': 1, 'username': 'alice'})
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,86 @@
+def batch(client, auth, requests):
+    return client.post('/batch', json={'requests': requests}, headers=auth)
+
+
+def test_batch_returns_results_in_order(client, auth):
+    response = batch(client, auth, [
+        {'method': 'POST', 'path': '/tasks', 'body': {'title': 'Write report', 'project_id': 1}},
+        {'path': '/projects'},
+        {'path': '/tasks'},
+        {'path': '/tasks/99'},
+    ])
+
+    assert response.status_code == 200
+    results = response.get_json()['responses']
+    assert [r['status'] for r in results] == [201, 200, 200, 404]
+    assert [t['title'] for t in results[2]['body']] == ['Write report']
+
+
+def test_batch_requires_jwt(client):
+    assert client.post('/batch', json={'requests': [{'path': '/tasks'}]}).status_code == 401
+
+
+def test_batch_rejects_headers_that_are_not_an_object(client, auth):
+    response = batch(client, auth, [{'path': '/projects', 'headers': ['a']}])
+
+    assert response.status_code == 400
+
+
+def test_batch_rejects_views_not_marked_batchable(client, auth):
+    results = batch(client, auth, [{'method': 'POST', 'path': '/login'}, {'method': 'POST', 'path': '/batch'}]).get_json()
+
+    assert [r['status'] for r in results['responses']] == [400, 400]
+
+
+def test_restored_jwt_is_seen_by_public_api(app, auth):
+    # Guards restore_jwt against changes to flask-jwt-extended's private attributes
+    from flask_jwt_extended import get_jwt, get_jwt_header, get_jwt_identity, get_jwt_request_location, verify_jwt_in_request
+    from app.batch import capture_jwt, restore_jwt
+
+    with app.test_request_context('/tasks', headers=auth):
+        verify_jwt_in_request()
+        captured = capture_jwt()
+
+    with app.app_context(), app.test_request_context('/tasks'):
+        restore_jwt(captured)
+        assert get_jwt() == captured['jwt']
+        assert get_jwt_identity() == {'id': 1, 'username': 'alice'}
+        assert get_jwt_header() == captured['header']
+        assert get_jwt_request_location() == 'headers'
+
+
+def test_sub_request_authorization_header_is_dropped_in_any_case(app, client, auth):
+    from flask import jsonify, request
+    from flask_jwt_extended import jwt_required
+    from app.batch import batchable
+
+    @jwt_required()
+    @batchable
+    def echo_headers():
+        return jsonify({'authorization': request.headers.get('Authorization')})
+
+    app.add_url_rule('/echo_headers', 'api.echo_headers', echo_headers)
+
+    results = batch(client, auth, [
+        {'path': '/echo_headers', 'headers': {'authorization': 'Bearer forged'}},
+        {'path': '/echo_headers', 'headers': {'AUTHORIZATION': 'Bearer forged'}},
+    ]).get_json()
+
+    assert [r['body'] for r in results['responses']] == [{'authorization': None}] * 2
+
+
+def test_unexpected_error_is_logged_not_returned(app, client, auth, caplog):
+    from flask_jwt_extended import jwt_required
+    from app.batch import batchable
+
+    @jwt_required()
+    @batchable
+    def broken():
+        raise RuntimeError('SELECT secret FROM users')
+
+    app.add_url_rule('/broken', 'api.broken', broken)
+
+    results = batch(client, auth, [{'path': '/broken'}]).get_json()
+
+    assert results['responses'] == [{'status': 500, 'body': {'message': 'Internal server error'}}]
+    assert 'SELECT secret' in caplog.text
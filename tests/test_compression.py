@@ -0,0 +1,112 @@
+import gzip
+import logging
+
+import pytest
+from flask import Response
+
+from app import db
+from app.compression import brotli, zstandard
+from app.models import Tasks
+
+AVAILABLE = [name for name, module in (('zstd', zstandard), ('br', brotli)) if module] + ['gzip']
+
+
+@pytest.fixture
+def tasks(app):
+    with app.app_context():
+        db.session.add_all(Tasks(project_id=1, title=f'Task {i}', description='x' * 50) for i in range(50))
+        db.session.commit()
+
+
+def get_tasks(client, auth, **headers):
+    return client.get('/tasks', headers=dict(auth, **headers))
+
+
+def decompress(encoding, data):
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'br':
+        return brotli.decompress(data)
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('gzip;q=0, br;q=0, zstd;q=0', None),
+    ('*', AVAILABLE[0]),
+    ('gzip;q=1, br;q=0.5, zstd;q=0.5', 'gzip'),
+])
+def test_encoding_is_negotiated_by_q_value(client, auth, tasks, accept_encoding, expected):
+    response = get_tasks(client, auth, **{'Accept-Encoding': accept_encoding})
+
+    assert response.headers.get('Content-Encoding') == expected
+
+
+@pytest.mark.parametrize('encoding', AVAILABLE)
+def test_each_encoder_round_trips(client, auth, tasks, encoding):
+    plain = get_tasks(client, auth, **{'Accept-Encoding': 'identity'}).data
+
+    response = get_tasks(client, auth, **{'Accept-Encoding': encoding})
+
+    assert response.headers['Content-Encoding'] == encoding
+    assert decompress(encoding, response.data) == plain
+    assert len(response.data) < len(plain)
+    assert float(response.headers['X-Compression-Ratio']) == pytest.approx(len(plain) / len(response.data), rel=0.01)
+
+
+def test_small_bodies_are_not_compressed(client, auth):
+    response = client.get('/projects', headers=dict(auth, **{'Accept-Encoding': 'gzip'}))
+
+    assert len(response.data) < 1024
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_threshold_is_configurable(app, client, auth):
+    app.extensions['compression'].min_size = 10
+
+    response = client.get('/projects', headers=dict(auth, **{'Accept-Encoding': 'gzip'}))
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_streamed_response_is_compressed_chunk_by_chunk(app, client, caplog):
+    chunks = [f'{{"line": {i}}}\n' * 20 for i in range(5)]
+    app.add_url_rule('/stream', 'stream', lambda: Response(iter(chunks), mimetype='application/json'))
+
+    with caplog.at_level(logging.INFO, logger='app.compression'):
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+        parts = [part for part in response.response if part]
+        response.close()
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    # One flushed block per chunk plus the gzip trailer
+    assert len(parts) == len(chunks) + 1
+    assert gzip.decompress(b''.join(parts)).decode() == ''.join(chunks)
+    assert 'compressed encoding=gzip' in caplog.text
+
+
+def test_list_response_varies_on_accept_and_encoding(client, auth, tasks):
+    pytest.importorskip('msgpack')  # Accept only matters when MessagePack can be served
+
+    response = get_tasks(client, auth, **{'Accept-Encoding': 'gzip'})
+
+    assert {'Accept', 'Accept-Encoding'} <= set(response.vary)
+
+
+def test_msgpack_is_returned_when_preferred(client, auth, tasks):
+    msgpack = pytest.importorskip('msgpack')
+
+    response = get_tasks(client, auth, **{'Accept': 'application/msgpack', 'Accept-Encoding': 'identity'})
+
+    assert response.mimetype == 'application/msgpack'
+    assert [task['title'] for task in msgpack.unpackb(response.data)][:2] == ['Task 0', 'Task 1']
+
+
+def test_json_is_the_default_format(client, auth, tasks):
+    response = get_tasks(client, auth, **{'Accept': '*/*', 'Accept-Encoding': 'identity'})
+
+    assert response.mimetype == 'application/json'
@@ -0,0 +1,117 @@
+from app import db
+from app.models import IdempotencyKeys, Tasks
+from conftest import make_app
+
+TASK = {'title': 'Write report', 'project_id': 1}
+
+
+def task_count(app):
+    with app.app_context():
+        return Tasks.query.count()
+
+
+def test_retry_replays_stored_response(app, client, auth):
+    headers = dict(auth, **{'Idempotency-Key': 'abc'})
+    first = client.post('/tasks', json=TASK, headers=headers)
+    retry = client.post('/tasks', json=TASK, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert task_count(app) == 1
+
+
+def test_retry_on_another_worker_is_replayed(app, client, auth, database_uri):
+    # A second app on the same database stands in for another gunicorn worker
+    other_worker = make_app(database_uri).test_client()
+    headers = dict(auth, **{'Idempotency-Key': 'abc'})
+
+    first = client.post('/tasks', json=TASK, headers=headers)
+    retry = other_worker.post('/tasks', json=TASK, headers=headers)
+
+    assert retry.get_json() == first.get_json()
+    assert task_count(app) == 1
+
+
+def test_duplicate_waits_for_request_in_progress(app, client, auth):
+    headers = dict(auth, **{'Idempotency-Key': 'abc'})
+    first = client.post('/tasks', json=TASK, headers=headers)
+    with app.app_context():
+        row = IdempotencyKeys.query.one()
+        row.status_code = None
+        db.session.commit()
+    app.config['IDEMPOTENCY_WAIT_TIMEOUT'] = 0.2
+
+    retry = client.post('/tasks', json=TASK, headers=headers)
+
+    assert first.status_code == 201
+    assert retry.status_code == 409
+    assert task_count(app) == 1
+
+
+def test_key_reused_with_different_body_is_rejected(client, auth):
+    headers = dict(auth, **{'Idempotency-Key': 'abc'})
+    client.post('/tasks', json=TASK, headers=headers)
+
+    response = client.post('/tasks', json=dict(TASK, title='Other'), headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_failed_request_is_not_stored(app, client, auth):
+    headers = dict(auth, **{'Idempotency-Key': 'abc'})
+
+    assert client.post('/tasks', json={'title': 'No project'}, headers=headers).status_code == 400
+    with app.app_context():
+        assert IdempotencyKeys.query.count() == 0
+
+
+def test_key_survives_username_change(app, client, auth):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        renamed = {'Authorization': 'Bearer ' + create_access_token(identity={'id': 1, 'username': 'alice2'})}
+
+    first = client.post('/tasks', json=TASK, headers=dict(auth, **{'Idempotency-Key': 'abc'}))
+    retry = client.post('/tasks', json=TASK, headers=dict(renamed, **{'Idempotency-Key': 'abc'}))
+
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    assert task_count(app) == 1
+
+
+def test_concurrent_duplicates_run_the_handler_once(app, auth):
+    import threading
+    import time
+    from flask import jsonify
+    from flask_jwt_extended import jwt_required
+    from app.idempotency import idempotent
+
+    started = threading.Event()
+
+    def slow_create_task():
+        started.set()
+        time.sleep(0.5)  # Keeps the key in progress while the duplicate arrives
+        task = Tasks(project_id=1, title='Slow')
+        db.session.add(task)
+        db.session.commit()
+        return jsonify(task.to_dict()), 201
+
+    app.add_url_rule('/slow_tasks', 'slow_tasks', jwt_required()(idempotent(slow_create_task)), methods=['POST'])
+    headers = dict(auth, **{'Idempotency-Key': 'abc'})
+    responses = []
+
+    def post():
+        responses.append(app.test_client().post('/slow_tasks', json=TASK, headers=headers))
+
+    first = threading.Thread(target=post)
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=post)
+    second.start()
+    first.join()
+    second.join()
+
+    assert [r.status_code for r in responses] == [201, 201]
+    assert [r.headers.get('Idempotent-Replayed') for r in responses].count('true') == 1
+    assert responses[0].get_json() == responses[1].get_json()
+    assert task_count(app) == 1
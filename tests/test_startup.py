@@ -0,0 +1,78 @@
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+import app as app_package
+from app import MIGRATIONS_DIR
+from conftest import make_app
+
+
+@pytest.fixture(autouse=True)
+def fresh_process(monkeypatch):
+    monkeypatch.delenv('FLASK_RUN_FROM_CLI', raising=False)
+    monkeypatch.setattr(app_package, '_migrations_checked', False)
+
+
+def table_names(database_uri):
+    return set(sa.inspect(sa.create_engine(database_uri)).get_table_names())
+
+
+def stamp(database_uri, revision):
+    with sa.create_engine(database_uri).begin() as connection:
+        connection.execute(sa.text('CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)'))
+        connection.execute(sa.text('INSERT INTO alembic_version VALUES (:rev)'), {'rev': revision})
+
+
+def head():
+    return ScriptDirectory(MIGRATIONS_DIR).get_current_head()
+
+
+def test_development_creates_tables_on_fresh_database(database_uri):
+    make_app(database_uri)
+
+    assert 'tasks' in table_names(database_uri)
+
+
+def test_development_leaves_stamped_database_to_alembic(database_uri):
+    stamp(database_uri, '2843e868ea6a')
+
+    make_app(database_uri)
+
+    assert table_names(database_uri) == {'alembic_version'}
+
+
+def test_production_skips_create_all(database_uri):
+    make_app(database_uri, STARTUP_MODE='production', CHECK_MIGRATIONS=False)
+
+    assert table_names(database_uri) == set()
+
+
+def test_production_refuses_database_behind_head(database_uri):
+    stamp(database_uri, '2843e868ea6a')
+
+    with pytest.raises(RuntimeError, match='does not match migration head'):
+        make_app(database_uri, STARTUP_MODE='production')
+
+
+def test_production_checks_migrations_once_per_process(database_uri, monkeypatch):
+    stamp(database_uri, head())
+    calls = []
+    configure = MigrationContext.configure
+    monkeypatch.setattr(MigrationContext, 'configure', lambda *a, **kw: calls.append(1) or configure(*a, **kw))
+
+    make_app(database_uri, STARTUP_MODE='production')
+    make_app(database_uri, STARTUP_MODE='production')
+
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('mode', ['development', 'production'])
+def test_cli_neither_checks_nor_creates_tables(database_uri, monkeypatch, mode):
+    monkeypatch.setenv('FLASK_RUN_FROM_CLI', 'true')
+    stamp(database_uri, '2843e868ea6a')
+
+    app = make_app(database_uri, STARTUP_MODE=mode)
+
+    assert 'migrate' in app.extensions
+    assert table_names(database_uri) == {'alembic_version'}
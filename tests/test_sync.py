@@ -0,0 +1,100 @@
+from app import db
+from app.models import ChangeLog, Tasks
+
+TASK = {'title': 'Write report', 'project_id': 1}
+
+
+def sync(client, auth, since=0, limit=500):
+    response = client.get(f'/sync?since={since}&limit={limit}', headers=auth)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_sync_returns_only_changes_after_cursor(client, auth):
+    client.post('/tasks', json=TASK, headers=auth)
+    cursor = sync(client, auth)['cursor']
+    client.post('/tasks', json=dict(TASK, title='Second'), headers=auth)
+
+    page = sync(client, auth, since=cursor)
+
+    assert [change['data']['title'] for change in page['changes']] == ['Second']
+    assert page['cursor'] > cursor
+
+
+def test_changes_to_one_object_are_collapsed(client, auth):
+    client.post('/tasks', json=TASK, headers=auth)
+    client.put('/tasks/1', json={'title': 'Renamed'}, headers=auth)
+    client.post('/tasks', json=TASK, headers=auth)
+    client.delete('/tasks/2', headers=auth)
+
+    changes = sync(client, auth)['changes']
+
+    assert [(c['id'], c['action']) for c in changes] == [(1, 'upsert'), (2, 'delete')]
+    assert changes[0]['data']['title'] == 'Renamed'
+
+
+def test_pages_follow_cursor(client, auth):
+    for i in range(3):
+        client.post('/tasks', json=dict(TASK, title=f'Task {i}'), headers=auth)
+
+    first = sync(client, auth, limit=2)
+    second = sync(client, auth, since=first['cursor'], limit=2)
+
+    assert first['has_more'] and not second['has_more']
+    assert [c['id'] for c in first['changes'] + second['changes']] == [1, 2, 3]
+
+
+def test_change_committed_out_of_order_is_not_skipped(app, client, auth):
+    # Transaction A takes change_log id 10 but commits after transaction B's
+    # id 11 has already been synced
+    with app.app_context():
+        task_a = Tasks(project_id=1, title='A')
+        task_b = Tasks(project_id=1, title='B')
+        db.session.add_all([task_a, task_b])
+        db.session.commit()
+        task_a_id = task_a.id
+        db.session.add(ChangeLog(id=11, user_id=1, resource='tasks', resource_id=task_b.id, action='upsert'))
+        db.session.commit()
+
+    page = sync(client, auth)
+    assert [c['data']['title'] for c in page['changes']] == ['B']
+
+    with app.app_context():
+        db.session.add(ChangeLog(id=10, user_id=1, resource='tasks', resource_id=task_a_id, action='upsert'))
+        db.session.commit()
+
+    page = sync(client, auth, since=page['cursor'])
+    assert [c['data']['title'] for c in page['changes']] == ['A']
+
+
+def test_task_with_unknown_project_is_rejected(client, auth):
+    client.post('/tasks', json=TASK, headers=auth)
+
+    created = client.post('/tasks', json=dict(TASK, project_id=99), headers=auth)
+    updated = client.put('/tasks/1', json={'project_id': 99}, headers=auth)
+
+    assert created.status_code == updated.status_code == 400
+    assert created.get_json() == {'message': 'Project not found'}
+
+
+def test_task_moved_to_another_users_project_is_deleted_for_previous_owner(app, client, auth):
+    from flask_jwt_extended import create_access_token
+    from app.models import Projects, Users
+
+    with app.app_context():
+        bob = Users(username='bob', email='bob@example.com', password='x')
+        db.session.add(bob)
+        db.session.commit()
+        db.session.add(Projects(user_id=bob.id, name="Bob's"))
+        db.session.commit()
+        bob_auth = {'Authorization': 'Bearer ' + create_access_token(identity={'id': bob.id, 'username': 'bob'})}
+
+    client.post('/tasks', json=TASK, headers=auth)
+    cursor = sync(client, auth)['cursor']
+    client.put('/tasks/1', json={'project_id': 2}, headers=auth)
+
+    alice_changes = sync(client, auth, since=cursor)['changes']
+    bob_changes = sync(client, bob_auth)['changes']
+
+    assert [(c['resource'], c['id'], c['action']) for c in alice_changes] == [('tasks', 1, 'delete')]
+    assert [(c['id'], c['action']) for c in bob_changes if c['resource'] == 'tasks'] == [(1, 'upsert')]